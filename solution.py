@@ -2,84 +2,153 @@
 Main entry point for ETL pipeline
 """
 
-import argparse
 import logging
+import logging.handlers
+import re
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from solution.pipeline import ETLPipeline
 from solution.config import load_config, ETLConfig
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
-def create_argument_parser() -> argparse.ArgumentParser:
-    """Create simple argument parser"""
-    parser = argparse.ArgumentParser(
-        description='ETL Pipeline for processing accounting journal entries'
-    )
-    
-    parser.add_argument(
-        '--db-path',
-        help='Path to SQLite database file'
-    )
-    
-    parser.add_argument(
-        '--output-path', 
-        help='Path for output XML file'
-    )
-    
-    return parser
+USAGE = "usage: solution.py [-h] [--db-path DB_PATH] [--output-path OUTPUT_PATH]"
+
+HELP = f"""{USAGE}
+
+ETL Pipeline for processing accounting journal entries
+
+options:
+  -h, --help            show this help message and exit
+  --db-path DB_PATH     Path to SQLite database file
+  --output-path OUTPUT_PATH
+                        Path for output XML file"""
+
+# Command line option -> parsed argument name
+OPTIONS: Dict[str, str] = {
+    '--db-path': 'db_path',
+    '--output-path': 'output_path',
+}
+
+# Dash-prefixed values argparse still takes as arguments rather than options
+NEGATIVE_NUMBER = re.compile(r'^-\d+$|^-\d*\.\d+$')
+
+
+def usage_error(message: str) -> None:
+    """Print usage with an error message and exit like argparse does"""
+    print(f"{USAGE}\nsolution.py: error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+
+def match_option(option: str) -> Optional[str]:
+    """Resolve a long option or an unambiguous prefix of one, like argparse"""
+    if option in OPTIONS or option == '--help':
+        return option
+    if not option.startswith('--') or option == '--':
+        return None
+    matches = [name for name in ('--help', *OPTIONS) if name.startswith(option)]
+    if len(matches) > 1:
+        usage_error(f"ambiguous option: {option} could match {', '.join(matches)}")
+    return matches[0] if matches else None
+
+
+def looks_like_option(arg: str) -> bool:
+    """Whether argparse would read arg as an option rather than a value"""
+    return (arg.startswith('-') and arg != '-' and ' ' not in arg
+            and not NEGATIVE_NUMBER.match(arg))
+
+
+def parse_args(argv: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse command line arguments
+
+    A tiny replacement for argparse, which costs more to import and set up
+    than the whole parse for two options. It follows argparse's rules:
+    long options may be abbreviated to a unique prefix, and a separate
+    value must not look like an option.
+
+    Args:
+        argv: Arguments without the program name, e.g. sys.argv[1:]
+
+    Returns:
+        Dictionary with 'db_path' and 'output_path' (None when not given)
+    """
+    args: Dict[str, Optional[str]] = dict.fromkeys(OPTIONS.values())
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+
+        # Accept both "--option value" and "--option=value"
+        option, has_value, value = arg.partition('=')
+        name = match_option(option)
+        if arg == '-h' or name == '--help':
+            print(HELP)
+            sys.exit(0)
+        if name is None:
+            usage_error(f"unrecognized arguments: {arg}")
+        if not has_value:
+            i += 1
+            if i == len(argv) or looks_like_option(argv[i]):
+                usage_error(f"argument {name}: expected one argument")
+            value = argv[i]
+
+        args[OPTIONS[name]] = value
+        i += 1
+
+    return args
 
 
 def main() -> None:
     """Main entry point"""
     # Parse command line arguments
-    parser = create_argument_parser()
-    args = parser.parse_args()
+    args = parse_args(sys.argv[1:])
     
-    # Load configuration
-    config: ETLConfig = load_config()
+    # Hold log records emitted while loading the configuration until
+    # logging can be set up from it
+    root_logger = logging.getLogger()
+    startup_logs = logging.handlers.MemoryHandler(capacity=1000)
+    root_logger.addHandler(startup_logs)
+    root_logger.setLevel(logging.DEBUG)
+    try:
+        # Load configuration
+        config: ETLConfig = load_config()
+    finally:
+        root_logger.removeHandler(startup_logs)
     
-    # Configure logging from config
+    # Configure logging from config, once
     logging.basicConfig(
         level=getattr(logging, config.logging.level),
         format=config.logging.format,
         force=True
     )
+    for record in startup_logs.buffer:
+        if root_logger.isEnabledFor(record.levelno):
+            root_logger.handle(record)
     
-    # Get project root and paths
+    # Resolve each path once: CLI arguments or config defaults, relative
+    # paths taken from the project root (an absolute path replaces it)
     project_root: Path = Path(__file__).parent
-    paths = config.get_absolute_paths(project_root)
-    
-    # Use CLI arguments or config defaults
-    db_path: str = args.db_path or paths['database']
-    output_path: str = args.output_path or paths['output']
-    schema_path: Optional[str] = paths['schema']
-    
-    # Convert relative paths to absolute
-    if not Path(db_path).is_absolute():
-        db_path = str(project_root / db_path)
-    if not Path(output_path).is_absolute():
-        output_path = str(project_root / output_path)
+    db_file: Path = project_root / (args['db_path'] or config.paths.database)
+    output_file: Path = project_root / (args['output_path'] or config.paths.output)
+    schema_file: Path = project_root / config.paths.schema
     
     # Check database exists
-    if not Path(db_path).exists():
-        logger.error(f"Database file not found: {db_path}")
-        raise FileNotFoundError(f"Database file not found: {db_path}")
+    if not db_file.exists():
+        logger.error(f"Database file not found: {db_file}")
+        raise FileNotFoundError(f"Database file not found: {db_file}")
     
     # Check schema exists
-    if not Path(schema_path).exists():
-        logger.warning(f"Schema file not found: {schema_path}. Proceeding without schema validation.")
+    schema_path: Optional[str] = str(schema_file)
+    if not schema_file.exists():
+        logger.warning(f"Schema file not found: {schema_file}. Proceeding without schema validation.")
         schema_path = None
 
     # Create and run pipeline
-    pipeline: ETLPipeline = ETLPipeline(db_path, output_path, schema_path, config)
+    pipeline: ETLPipeline = ETLPipeline(str(db_file), str(output_file), schema_path, config)
     pipeline.run()
 
 
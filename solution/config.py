@@ -1,9 +1,15 @@
 import json
+import os
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import ClassVar, Optional, Dict, Any, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:  # Optional speedup, fall back to the stdlib parser
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +27,7 @@ class ProcessingConfig:
     batch_size: int = 1000
     skip_validation: bool = False
     max_description_length: int = 255
+    workers: int = 1
 
 
 @dataclass
@@ -45,10 +52,18 @@ class ETLConfig:
     logging: LoggingConfig
     output: OutputConfig
 
+    # Parsed config files keyed by absolute path, along with the
+    # (mtime, size) stamp they were parsed at
+    _cache: ClassVar[Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]]] = {}
+
     @classmethod
     def load_from_file(cls, config_path: Optional[str] = None) -> 'ETLConfig':
         """
         Load configuration from JSON file
+
+        Parsed files are cached per path and only re-read when their
+        modification time or size changes. Each call returns a fresh
+        instance, so callers may modify it freely.
         
         Args:
             config_path: Path to config file. If None, tries default locations.
@@ -63,10 +78,25 @@ class ETLConfig:
         # Load from file if exists
         if config_path and Path(config_path).exists():
             try:
+                stat = os.stat(config_path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                cache_key = os.path.abspath(config_path)
+
+                cached = cls._cache.get(cache_key)
+                if cached is not None and cached[0] == stamp:
+                    logger.debug(f"Using cached configuration for: {config_path}")
+                    return cls.from_dict(cached[1])
+
                 logger.info(f"Loading configuration from: {config_path}")
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
-                return cls.from_dict(config_data)
+                if orjson is not None:
+                    with open(config_path, 'rb') as f:
+                        config_data = orjson.loads(f.read())
+                else:
+                    with open(config_path, 'r', encoding='utf-8') as f:
+                        config_data = json.load(f)
+                config = cls.from_dict(config_data)
+                cls._cache[cache_key] = (stamp, config_data)
+                return config
             except (json.JSONDecodeError, KeyError, TypeError) as e:
                 logger.warning(f"Failed to load config from {config_path}: {e}")
                 logger.info("Using default configuration")
@@ -103,8 +133,12 @@ class ETLConfig:
     def save_to_file(self, config_path: str) -> None:
         """Save configuration to JSON file"""
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.to_dict(), f, indent=2)
+            if orjson is not None:
+                with open(config_path, 'wb') as f:
+                    f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
+            else:
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.to_dict(), f, indent=2)
             logger.info(f"Configuration saved to: {config_path}")
         except IOError as e:
             logger.error(f"Failed to save config to {config_path}: {e}")
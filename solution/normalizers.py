@@ -1,10 +1,54 @@
-from datetime import datetime
+from datetime import date
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
-from typing import Optional, List
+from typing import Any, Optional
 import re
 
 
-def normalize_date(date_str: str) -> Optional[str]:
+# Supported date formats, compiled once. Fields may be one or two digits
+# long and the ISO time part is separated by "T" or whitespace, as with
+# strptime. Unlike strptime, fields must be ASCII digits (no full-width or
+# other Unicode digits, no space-padded days) and the separating
+# whitespace must be ASCII, matching what validate_account accepts.
+_ISO_DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})(?:(?:[Tt]|\s+)(\d{1,2}):(\d{1,2}):(\d{1,2}))?',
+                          re.ASCII)
+_US_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})', re.ASCII)
+_EU_DATE_RE = re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})', re.ASCII)
+
+# Days per month in a common year
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Quantum for rounding amounts to cents
+_CENTS = Decimal('0.01')
+
+# Longest integer part whose value with cents still fits the default
+# 28-digit Decimal context that quantize() rounds in
+_MAX_FAST_AMOUNT_DIGITS = 26
+
+
+def _format_date(year: int, month: int, day: int) -> Optional[str]:
+    """
+    Format a date as YYYY-MM-DD after checking it exists
+
+    Uses plain range checks rather than constructing a date and catching
+    ValueError, which is much cheaper for invalid input.
+
+    Returns:
+        Formatted date string or None if the date doesn't exist
+    """
+    if year < 1 or month < 1 or month > 12 or day < 1:
+        return None
+
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        max_day = 29
+    else:
+        max_day = _DAYS_IN_MONTH[month - 1]
+    if day > max_day:
+        return None
+
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def normalize_date(date_str: Any) -> Optional[str]:
     """
     Normalize various date formats to ISO format (YYYY-MM-DD)
     
@@ -13,6 +57,8 @@ def normalize_date(date_str: str) -> Optional[str]:
     - ISO datetime: 2024-01-01T14:30:00 or 2024-01-01 14:30:00
     - US format: 12/31/2024
     - European format: 31-12-2024
+
+    Fields must be ASCII digits.
     
     Returns:
         Normalized date string or None if invalid
@@ -21,27 +67,51 @@ def normalize_date(date_str: str) -> Optional[str]:
         return None
     
     date_str = date_str.strip()
-    
-    # Try different date formats
-    formats: List[str] = [
-        '%Y-%m-%d',           # ISO date
-        '%Y-%m-%dT%H:%M:%S',  # ISO datetime with T
-        '%Y-%m-%d %H:%M:%S',  # ISO datetime with space
-        '%m/%d/%Y',           # US format
-        '%d-%m-%Y',           # European format
-    ]
-    
-    for fmt in formats:
+
+    # Fast path for the common YYYY-MM-DD and YYYY-MM-DDTHH:MM:SS shapes,
+    # told apart by length and separator positions
+    if (len(date_str) == 19 and date_str[4] == '-' and date_str[7] == '-' and date_str[10] in 'Tt '
+            and date_str[13] == ':' and date_str[16] == ':'):
+        # Only when every field is two ASCII digits; validate the time part,
+        # then drop it. Anything else is left for the patterns below.
+        digits = (date_str[:4] + date_str[5:7] + date_str[8:10]
+                  + date_str[11:13] + date_str[14:16] + date_str[17:])
+        if digits.isascii() and digits.isdigit():
+            if int(date_str[11:13]) > 23 or int(date_str[14:16]) > 59 or int(date_str[17:]) > 59:
+                return None
+            date_str = date_str[:10]
+
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
         try:
-            parsed_date = datetime.strptime(date_str, fmt)
-            return parsed_date.strftime('%Y-%m-%d')
+            return date.fromisoformat(date_str).isoformat()
         except ValueError:
-            continue
-    
-    return None
+            pass
 
+    # Dispatch on separator so only one pattern runs
+    if '/' in date_str:
+        # US format
+        match = _US_DATE_RE.fullmatch(date_str)
+        if not match:
+            return None
+        month, day, year = match.groups()
+    else:
+        match = _ISO_DATE_RE.fullmatch(date_str)
+        if match:
+            # ISO date or datetime; the time part is validated, then dropped
+            year, month, day, hour, minute, second = match.groups()
+            if hour is not None and (int(hour) > 23 or int(minute) > 59 or int(second) > 59):
+                return None
+        else:
+            # European format
+            match = _EU_DATE_RE.fullmatch(date_str)
+            if not match:
+                return None
+            day, month, year = match.groups()
 
-def normalize_amount(amount_str: str) -> Optional[str]:
+    return _format_date(int(year), int(month), int(day))
+
+
+def normalize_amount(amount_str: Any) -> Optional[str]:
     """
     Normalize amount to decimal format with exactly 2 decimal places
     
@@ -62,27 +132,44 @@ def normalize_amount(amount_str: str) -> Optional[str]:
     
     # Replace European decimal comma with dot
     amount_str = amount_str.replace(',', '.')
-    
+
+    # Fast path: amounts already in canonical form (no leading zeros,
+    # exactly 2 ASCII decimals) come back unchanged, without a Decimal.
+    # Checked by position so only the integer digits get sliced out.
+    # Longer amounts fall through, so the Decimal context's precision
+    # still decides whether they fit.
+    if len(amount_str) >= 4 and amount_str[-3] == '.' and amount_str.isascii():
+        digits = amount_str[1:-3] if amount_str[0] == '-' else amount_str[:-3]
+        cents = amount_str[-2:]
+        if (digits.isdigit() and cents.isdigit() and len(digits) <= _MAX_FAST_AMOUNT_DIGITS
+                and (digits[0] != '0' or len(digits) == 1)):
+            # Handle -0 case
+            if digits == '0' and cents == '00':
+                return "0.00"
+            return amount_str
+
     try:
         # Parse to Decimal for precise financial calculations
         amount = Decimal(amount_str)
         
-        # Round to 2 decimal places using banker's rounding
-        rounded = amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        # Round to 2 decimal places, halves away from zero
+        rounded = amount.quantize(_CENTS, rounding=ROUND_HALF_UP)
         
         # Handle -0 case
-        if rounded == 0:
+        if not rounded:
             return "0.00"
             
-        # Format with exactly 2 decimal places
-        return f"{rounded:.2f}"
+        # A value quantized to 0.01 always prints as plain notation with
+        # exactly 2 decimal places, so str() is enough (and much cheaper
+        # than format())
+        return str(rounded)
     except (ValueError, TypeError, InvalidOperation):
         return None
 
 
-def validate_account(account_str: str) -> Optional[str]:
+def validate_account(account_str: Any) -> Optional[str]:
     """
-    Validate account number (must be 3-12 digits only)
+    Validate account number (must be 3-12 ASCII digits only)
     
     Returns:
         Account string if valid, None otherwise
@@ -92,18 +179,19 @@ def validate_account(account_str: str) -> Optional[str]:
     
     account_str = account_str.strip()
     
-    # Check if it's only digits and within length constraints
-    if re.match(r'^\d{3,12}$', account_str):
+    # Check length first, then that it's only ASCII digits. isascii() just
+    # reads a flag on the string object, so only isdigit() walks the chars.
+    if 3 <= len(account_str) <= 12 and account_str.isascii() and account_str.isdigit():
         return account_str
     
     return None
 
 
-def clean_description(desc_str: Optional[str]) -> str:
+def clean_description(desc_str: Any, max_length: int = 255) -> str:
     """
     Clean description field
     - Trim whitespace
-    - Truncate to 255 characters
+    - Truncate to max_length characters (255 by default)
     - Can be empty
     
     Returns:
@@ -112,11 +200,7 @@ def clean_description(desc_str: Optional[str]) -> str:
     if not desc_str:
         return ""
     
-    # Convert to string and trim
-    desc_str = str(desc_str).strip()
-    
-    # Truncate to 255 characters
-    if len(desc_str) > 255:
-        desc_str = desc_str[:255]
-    
-    return desc_str
\ No newline at end of file
+    # Convert to string, trim and truncate in one go. Each step hands back
+    # the same object when there's nothing to change, so an already clean
+    # description is returned without being copied.
+    return str(desc_str).strip()[:max_length]
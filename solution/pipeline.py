@@ -1,8 +1,15 @@
+import multiprocessing
+import os
+import re
 import sqlite3
+import stat
 import logging
+import tempfile
 import time
+from collections import deque
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Deque, Dict, Iterable, Iterator, List, Tuple, Any
 from lxml import etree
 
 from .normalizers import (
@@ -15,6 +22,169 @@ from .config import ETLConfig
 
 logger = logging.getLogger(__name__)
 
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+# Characters str.strip() removes, so SQLite's trim() agrees with Python
+_WHITESPACE = ('\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003'
+               '\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000')
+
+# Same rule as validate_account, evaluated inside SQLite so rows that can
+# never be valid don't cross into Python. Already-clean accounts match the
+# first branch without paying for trim(). Dates and amounts only get checks
+# that can't reject anything the normalizers accept: both must be text,
+# and every supported date format has a '-' or '/' separator.
+EXTRACT_QUERY = """
+    SELECT Date, Account, Amount, substr(Description, 1, :max_description_length)
+    FROM journal_entries
+    WHERE typeof(Account) = 'text'
+      AND (length(Account) BETWEEN 3 AND 12 AND Account NOT GLOB '*[^0-9]*'
+           OR length(trim(Account, :whitespace)) BETWEEN 3 AND 12
+              AND trim(Account, :whitespace) NOT GLOB '*[^0-9]*')
+      AND typeof(Date) = 'text' AND Date GLOB '*[-/]*'
+      AND typeof(Amount) = 'text'
+"""
+
+COUNT_QUERY = "SELECT count(*) FROM journal_entries"
+
+# Read-side tuning for the extract connection
+READ_PRAGMAS = (
+    "PRAGMA cache_size = -65536",    # 64 MiB page cache
+    "PRAGMA mmap_size = 268435456",  # Memory-map up to 256 MiB of the file
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA query_only = ON",        # The pipeline never writes to the source
+)
+
+# Below this many rows, starting worker processes costs more than it saves
+MIN_PARALLEL_ROWS = 50_000
+
+# XML declaration exactly as lxml writes it
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8'?>\n"
+
+# Whitespace reproducing lxml's pretty_print layout for streamed entries
+_ENTRY_INDENT = "\n  "
+_FIELD_INDENT = "\n    "
+
+# Characters lxml escapes in text content, plus control characters XML
+# can't represent at all (lxml refuses to write those)
+_TEXT_SPECIALS_RE = re.compile('[&<>\r\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_TEXT_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '\r': '&#13;'}
+
+
+def _escape_char(match: 're.Match[str]') -> str:
+    """Return the escape for a special character, rejecting ones XML can't hold"""
+    try:
+        return _TEXT_ESCAPES[match.group()]
+    except KeyError:
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, "
+                         "no NULL bytes or control characters") from None
+
+
+def _escape_text(text: str) -> str:
+    """Escape text content the same way lxml serializes it"""
+    return _TEXT_SPECIALS_RE.sub(_escape_char, text)
+
+
+def _match_target_file(temp_path: str, target_path: str) -> None:
+    """
+    Give a finished temporary file the permissions of the file it replaces
+
+    mkstemp() creates files readable only by their owner. The existing
+    target's mode (and, where permitted, owner) is copied over; a new
+    file gets the default mode for the current umask, as open() would.
+    """
+    try:
+        target_stat = os.stat(target_path)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        return
+
+    os.chmod(temp_path, stat.S_IMODE(target_stat.st_mode))
+    if hasattr(os, 'chown'):
+        temp_stat = os.stat(temp_path)
+        if (temp_stat.st_uid, temp_stat.st_gid) != (target_stat.st_uid, target_stat.st_gid):
+            try:
+                os.chown(temp_path, target_stat.st_uid, target_stat.st_gid)
+            except PermissionError:
+                logger.debug(f"Could not keep the owner of {target_path}")
+
+
+def _chunked(rows: Iterable[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """Split rows into lists of at most size rows"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _normalize_chunk(rows: List[Tuple[Any, ...]],
+                     max_description_length: int) -> Tuple[List[Tuple[str, str, str, str]], int]:
+    """
+    Normalize a chunk of raw rows
+
+    Module-level (and free of pipeline state) so it can run in worker
+    processes.
+
+    Args:
+        rows: Raw (Date, Account, Amount, Description) rows
+        max_description_length: Maximum length of cleaned descriptions
+
+    Returns:
+        Tuple of (valid normalized records, number of skipped rows)
+    """
+    # Bind hot-loop lookups to locals once instead of per row
+    _nd, _na, _va, _cd = normalize_date, normalize_amount, validate_account, clean_description
+    records: List[Tuple[str, str, str, str]] = []
+    append = records.append
+    skipped_records = 0
+    # Share one string object per distinct value within the chunk; repeated
+    # accounts/descriptions then cost one pickle memo reference each when
+    # chunks are sent back from worker processes
+    interned: Dict[str, str] = {}
+    _intern = interned.setdefault
+
+    for record in rows:
+        date, account, amount, desc = record
+
+        # Normalize each field
+        normalized_date = _nd(date)
+        normalized_amount = _na(amount)
+        validated_account = _va(account)
+        cleaned_description = _cd(desc, max_description_length)
+
+        # Check if all required fields are valid
+        if normalized_date and normalized_amount and validated_account:
+            validated_account = _intern(validated_account, validated_account)
+            cleaned_description = _intern(cleaned_description, cleaned_description)
+            append((normalized_date, validated_account, normalized_amount, cleaned_description))
+        else:
+            skipped_records += 1
+            logger.debug("Skipped invalid record: %s", record)
+
+    return records, skipped_records
+
+
+def _normalize_parallel(chunks: Iterator[List[Tuple[Any, ...]]], workers: int,
+                        max_description_length: int) -> Iterator[Tuple[List[Tuple[str, str, str, str]], int]]:
+    """
+    Normalize chunks in a process pool, yielding results in input order
+
+    Only a bounded number of chunks is in flight at once so memory stays
+    independent of the input size.
+    """
+    max_pending = 2 * workers
+    with multiprocessing.Pool(workers) as pool:
+        pending: Deque[Any] = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_normalize_chunk, (chunk, max_description_length)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
 
 class ETLPipeline:
     """Main ETL Pipeline for processing journal entries"""
@@ -34,6 +204,10 @@ class ETLPipeline:
         self.output_path: str = output_path
         self.schema_path: Optional[str] = schema_path
         self.config: ETLConfig = config or ETLConfig.default()
+        if self.config.processing.batch_size < 1:
+            raise ValueError(
+                f"processing.batch_size must be at least 1, "
+                f"got {self.config.processing.batch_size}")
 
         # Statistics
         self.total_records: int = 0
@@ -41,172 +215,263 @@ class ETLPipeline:
         self.skipped_records: int = 0
         
         # Performance tracking
-        self.extract_time: float = 0.0
+        self.extract_time: float = 0.0  # Query execution only; rows stream into load
+        # Transformation runs lazily while the XML is written, so its time
+        # is included in load_time and this stays 0.0
         self.transform_time: float = 0.0
         self.load_time: float = 0.0
 
-    def extract(self) -> List[Dict[str, Any]]:
+    def extract(self) -> Iterator[Tuple[Any, ...]]:
         """
         Extract data from SQLite database
-        
+
+        The query is executed eagerly so connection and SQL errors surface
+        here; rows are then streamed from the cursor one at a time instead
+        of being materialized up front. Records that can never be valid
+        (bad accounts, non-text dates or amounts, dates without a
+        separator) are filtered out by SQLite and counted as skipped, and
+        Description is already truncated to ``max_description_length``.
+
         Returns:
-            List of dictionaries containing raw data
+            Iterator over raw (Date, Account, Amount, Description) rows
         """
         start_time = time.time()
         logger.info(f"Connecting to database: {self.db_path}")
 
+        conn = None
         try:
             conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            # Query all journal entries
-            cursor.execute("SELECT Date, Account, Amount, Description FROM journal_entries")
-            rows = cursor.fetchall()
+            for pragma in READ_PRAGMAS:
+                conn.execute(pragma)
 
-            # Convert to list of dictionaries
-            data = [dict(row) for row in rows]
+            params = {
+                'whitespace': _WHITESPACE,
+                'max_description_length': self.config.processing.max_description_length,
+            }
 
-            conn.close()
+            # Rows filtered out by the query still count as skipped
+            total_rows = conn.execute(COUNT_QUERY).fetchone()[0]
 
-            self.extract_time = time.time() - start_time
-            logger.info(f"Extracted {len(data)} records from database in {self.extract_time:.2f}s")
-            return data
+            # Query journal entries; rows come back as plain tuples in
+            # (Date, Account, Amount, Description) order
+            cursor = conn.execute(EXTRACT_QUERY, params)
 
         except sqlite3.Error as e:
+            if conn is not None:
+                conn.close()
             logger.error(f"Database error: {e}")
             raise
         except Exception as e:
+            if conn is not None:
+                conn.close()
             logger.error(f"Unexpected error during extraction: {e}")
             raise
 
-    def transform(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        self.extract_time = time.time() - start_time
+        logger.info(f"Query executed in {self.extract_time:.2f}s, streaming records")
+        return self._stream_rows(conn, cursor, total_rows)
+
+    def _stream_rows(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor,
+                     total_rows: int) -> Iterator[Tuple[Any, ...]]:
+        """Yield rows from cursor page by page, closing the connection once exhausted"""
+        cursor.arraysize = self.config.processing.batch_size
+        streamed = 0
+        try:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                streamed += len(rows)
+                yield from rows
+        finally:
+            conn.close()
+
+        # Rows rejected by the query never reach transform
+        rejected = total_rows - streamed
+        self.skipped_records += rejected
+        logger.info(f"Extracted {streamed} records, {rejected} invalid records filtered out by the query")
+
+    def transform(self, raw_data: Iterable[Tuple[Any, ...]]) -> Iterator[Tuple[str, str, str, str]]:
         """
         Transform and validate raw data
-        
+
+        Records are normalized lazily, one ``batch_size`` chunk at a time,
+        as the consumer pulls them. With ``processing.workers > 1`` chunks
+        are normalized in a process pool, preserving input order, unless
+        the input turns out to have fewer than ``MIN_PARALLEL_ROWS`` rows.
+
         Args:
-            raw_data: List of raw records from database
-            
-        Returns:
-            List of transformed and validated records
+            raw_data: Iterable of raw (Date, Account, Amount, Description) rows
+
+        Yields:
+            (Date, Account, Amount, Description) tuples of valid records
         """
-        start_time = time.time()
         logger.info("Starting data transformation")
 
-        transformed_data = []
-        self.total_records = len(raw_data)
-
-        for record in raw_data:
-            # Normalize each field
-            normalized_date = normalize_date(record.get('Date', ''))
-            normalized_amount = normalize_amount(record.get('Amount', ''))
-            validated_account = validate_account(record.get('Account', ''))
-            # Use config for description max length
-            desc = record.get('Description')
-            if desc and len(str(desc)) > self.config.processing.max_description_length:
-                desc = str(desc)[:self.config.processing.max_description_length]
-            cleaned_description = clean_description(desc)
-
-            # Check if all required fields are valid
-            if normalized_date and normalized_amount and validated_account:
-                transformed_record = {
-                    'Date': normalized_date,
-                    'Account': validated_account,
-                    'Amount': normalized_amount,
-                    'Description': cleaned_description
-                }
-                transformed_data.append(transformed_record)
-                self.valid_records += 1
+        workers = self.config.processing.workers
+        max_description_length = self.config.processing.max_description_length
+        chunks = _chunked(raw_data, self.config.processing.batch_size)
+        if workers > 1:
+            # Read ahead until there's enough work to be worth a pool
+            head = []
+            buffered_rows = 0
+            for chunk in chunks:
+                head.append(chunk)
+                buffered_rows += len(chunk)
+                if buffered_rows >= MIN_PARALLEL_ROWS:
+                    break
             else:
-                self.skipped_records += 1
-                logger.debug(f"Skipped invalid record: {record}")
+                logger.info(f"Only {buffered_rows} records, normalizing in-process")
+                workers = 1
+            chunks = chain(head, chunks)
+
+        if workers > 1:
+            logger.info(f"Normalizing records in {workers} worker processes")
+            results = _normalize_parallel(chunks, workers, max_description_length)
+        else:
+            results = (_normalize_chunk(chunk, max_description_length) for chunk in chunks)
+
+        for records, skipped_records in results:
+            self.valid_records += len(records)
+            self.skipped_records += skipped_records
+            yield from records
 
-        self.transform_time = time.time() - start_time
-        logger.info(f"Transformation complete: {self.valid_records} valid, {self.skipped_records} skipped in {self.transform_time:.2f}s")
-        return transformed_data
+        self.total_records = self.valid_records + self.skipped_records
+        logger.info(f"Transformation complete: {self.valid_records} valid, {self.skipped_records} skipped")
 
-    def load(self, data: List[Dict[str, str]]) -> None:
+    def load(self, data: Iterable[Tuple[str, str, str, str]]) -> None:
         """
         Generate XML file from transformed data
-        
+
+        Entries are formatted as text and written to disk as records
+        arrive, so the document is never held in memory. The output is
+        byte-for-byte what lxml would serialize; lxml is only needed to
+        validate it. When fed the lazy ``transform`` output this drives the
+        whole streaming pass.
+
+        The document is written to a temporary file next to
+        ``output_path`` and only moved into place once it is complete and
+        valid, so a failure part-way through leaves any previous output
+        untouched.
+
         Args:
-            data: List of transformed records
+            data: Iterable of transformed (Date, Account, Amount, Description) records
         """
         start_time = time.time()
         logger.info("Generating XML output")
 
-        # Create root element
-        root = etree.Element("Journal")
+        pretty_print = self.config.output.pretty_print
 
         # Add schema reference if schema path is provided
         if self.schema_path:
-            root.set("{http://www.w3.org/2001/XMLSchema-instance}noNamespaceSchemaLocation",
-                     "schema.xsd")
-
-        # Add each entry
-        for record in data:
-            entry = etree.SubElement(root, "Entry")
-
-            date_elem = etree.SubElement(entry, "Date")
-            date_elem.text = record['Date']
+            root_attrs = (f' xmlns:xsi="{XSI_NAMESPACE}"'
+                          f' xsi:noNamespaceSchemaLocation="schema.xsd"')
+        else:
+            root_attrs = ""
+
+        # Fixed parts of each entry, with the layout baked in. Date, Account
+        # and Amount come out of the normalizers as digits and separators,
+        # so only Description can need escaping.
+        entry_indent = _ENTRY_INDENT if pretty_print else ""
+        field_indent = _FIELD_INDENT if pretty_print else ""
+        entry_start = f"{entry_indent}<Entry>{field_indent}<Date>"
+        account_start = f"</Date>{field_indent}<Account>"
+        amount_start = f"</Account>{field_indent}<Amount>"
+        description_start = f"</Amount>{field_indent}<Description>"
+        entry_end = f"</Description>{entry_indent}</Entry>"
+        bare_entry_end = f"</Amount>{entry_indent}</Entry>"
+        # pretty_print ends the document with a newline
+        trailer = "\n" if pretty_print else ""
+
+        # Resolve symlinks so a linked output_path is written through
+        target_path = os.path.realpath(self.output_path)
+        output_dir = os.path.dirname(target_path)
+        fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix=".journal-", suffix=".xml.tmp")
+        try:
+            # Write entries one at a time using config settings
+            try:
+                with open(fd, 'w', encoding='utf-8', newline='') as output_file:
+                    write = output_file.write
+                    write(XML_DECLARATION)
+
+                    records = iter(data)
+                    first = next(records, None)
+                    if first is None:
+                        # No entries: lxml writes an empty root element
+                        write(f"<Journal{root_attrs}/>{trailer}")
+                    else:
+                        write(f"<Journal{root_attrs}>")
+                        for date, account, amount, description in chain((first,), records):
+                            # Only add Description if it's not empty
+                            if description:
+                                write(f"{entry_start}{date}{account_start}{account}{amount_start}{amount}"
+                                      f"{description_start}{_escape_text(description)}{entry_end}")
+                            else:
+                                write(f"{entry_start}{date}{account_start}{account}{amount_start}{amount}"
+                                      f"{bare_entry_end}")
+                        write(f"{trailer}</Journal>{trailer}")
+            except IOError as e:
+                logger.error(f"Failed to write XML file: {e}")
+                raise
 
-            account_elem = etree.SubElement(entry, "Account")
-            account_elem.text = record['Account']
+            # Validate against schema if provided and enabled in config
+            if (self.config.output.validate_xml and
+                self.schema_path and Path(self.schema_path).exists()):
+                try:
+                    logger.info("Validating XML against schema")
+                    self._validate_output(temp_path)
+                    logger.info("XML validation successful")
+                except (etree.XMLSchemaError, etree.DocumentInvalid) as e:
+                    logger.error(f"Schema validation failed: {e}")
+                    raise
+
+            _match_target_file(temp_path, target_path)
+            os.replace(temp_path, target_path)
+        except BaseException:
+            # Don't leave a partial or invalid document behind
+            os.unlink(temp_path)
+            raise
 
-            amount_elem = etree.SubElement(entry, "Amount")
-            amount_elem.text = record['Amount']
+        self.load_time = time.time() - start_time
+        logger.info(f"XML file written to: {self.output_path} in {self.load_time:.2f}s")
 
-            # Only add Description if it's not empty
-            if record['Description']:
-                desc_elem = etree.SubElement(entry, "Description")
-                desc_elem.text = record['Description']
+    def _validate_output(self, xml_path: str) -> None:
+        """
+        Validate a written XML file against the schema
 
-        # Create pretty-printed XML
-        tree = etree.ElementTree(root)
+        The file is streamed through a validating parser and each entry is
+        discarded once checked, so memory use doesn't grow with the size
+        of the document.
 
-        # Validate against schema if provided and enabled in config
-        if (self.config.output.validate_xml and 
-            self.schema_path and Path(self.schema_path).exists()):
-            try:
-                logger.info("Validating XML against schema")
-                schema_doc = etree.parse(self.schema_path)
-                schema = etree.XMLSchema(schema_doc)
-                schema.assertValid(tree)
-                logger.info("XML validation successful")
-            except etree.XMLSchemaError as e:
-                logger.error(f"Schema validation failed: {e}")
-                raise
+        Args:
+            xml_path: Path of the XML file to validate
 
-        # Write to file using config settings
+        Raises:
+            etree.DocumentInvalid: If the document doesn't match the schema
+        """
+        schema = etree.XMLSchema(etree.parse(self.schema_path))
         try:
-            tree.write(self.output_path,
-                       pretty_print=self.config.output.pretty_print,
-                       xml_declaration=True,
-                       encoding='UTF-8')
-            self.load_time = time.time() - start_time
-            logger.info(f"XML file written to: {self.output_path} in {self.load_time:.2f}s")
-        except IOError as e:
-            logger.error(f"Failed to write XML file: {e}")
-            raise
+            for _, entry in etree.iterparse(xml_path, events=('end',), tag='Entry',
+                                            schema=schema, remove_blank_text=True):
+                entry.clear()
+                while entry.getprevious() is not None:
+                    del entry.getparent()[0]
+        except etree.XMLSyntaxError as e:
+            # Surface the same error as XMLSchema.assertValid()
+            raise etree.DocumentInvalid(str(e)) from e
 
     def run(self) -> None:
         """Execute the complete ETL pipeline"""
         logger.info("Starting ETL pipeline")
 
         try:
-            # Extract
-            raw_data = self.extract()
-
-            # Transform
-            transformed_data = self.transform(raw_data)
-
-            # Load
-            self.load(transformed_data)
+            # Extract, transform and load in a single streaming pass
+            self.load(self.transform(self.extract()))
 
             # Final statistics with performance metrics
             if self.total_records > 0:
                 success_rate = self.valid_records / self.total_records * 100
-                total_time = self.extract_time + self.transform_time + self.load_time
+                total_time = self.extract_time + self.load_time
                 throughput = self.total_records / total_time if total_time > 0 else 0
                 
                 logger.info(f"""
@@ -217,9 +482,8 @@ class ETLPipeline:
                     Success rate: {success_rate:.1f}%
                     
                     Performance:
-                    Extract time: {self.extract_time:.2f}s
-                    Transform time: {self.transform_time:.2f}s
-                    Load time: {self.load_time:.2f}s
+                    Query time: {self.extract_time:.2f}s
+                    Extract + transform + load time: {self.load_time:.2f}s
                     Total time: {total_time:.2f}s
                     Throughput: {throughput:.0f} records/second
                 """)
@@ -2,6 +2,7 @@ import pytest
 import sqlite3
 import tempfile
 import os
+import stat
 from pathlib import Path
 from lxml import etree
 from solution.normalizers import (
@@ -10,7 +11,14 @@ from solution.normalizers import (
     validate_account, 
     clean_description
 )
+from solution import pipeline as pipeline_module
 from solution.pipeline import ETLPipeline
+from solution.config import ETLConfig
+
+# Project paths, resolved once at import
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_SCHEMA_PATH = _PROJECT_ROOT / "sources" / "schema.xsd"
+_SCHEMA_EXISTS = _SCHEMA_PATH.exists()
 
 
 class TestDateNormalization:
@@ -46,11 +54,28 @@ class TestDateNormalization:
         assert normalize_date("") is None
         assert normalize_date(None) is None
         assert normalize_date("2024/01/01") is None  # Unsupported format
+        assert normalize_date("\uff12\uff10\uff12\uff14-01-01") is None  # Non-ASCII digits
+        assert normalize_date("2024-01- 5") is None  # Space-padded day
+        assert normalize_date("2024-01-01\xa014:30:00") is None  # Non-ASCII whitespace
+        assert normalize_date(["2024-01-01"]) is None  # Unhashable non-string input
     
     def test_edge_cases(self):
         assert normalize_date("  2024-01-01  ") == "2024-01-01"  # With spaces
         assert normalize_date("29-02-2023") is None  # Not a leap year
 
+    def test_single_digit_fields(self):
+        assert normalize_date("2024-1-5") == "2024-01-05"
+        assert normalize_date("1/5/2024") == "2024-01-05"
+        assert normalize_date("5-1-2024") == "2024-01-05"
+        assert normalize_date("0999-01-01") == "0999-01-01"  # Year stays 4 digits
+        assert normalize_date("2024-01-1  10:00:00") == "2024-01-01"  # Padded out to 19 chars
+
+    def test_invalid_datetimes(self):
+        assert normalize_date("2024-01-01T24:00:00") is None  # Invalid hour
+        assert normalize_date("2024-01-01T23:60:00") is None  # Invalid minute
+        assert normalize_date("2024-02-30T10:00:00") is None  # Invalid date part
+        assert normalize_date("31-12-2024T10:00:00") is None  # Time only follows ISO dates
+
 
 class TestAmountNormalization:
     """Test cases for amount normalization"""
@@ -94,11 +119,22 @@ class TestAmountNormalization:
         assert normalize_amount(None) is None
         assert normalize_amount("$100") is None
         assert normalize_amount("100 USD") is None
+        assert normalize_amount(["100"]) is None
     
     def test_edge_cases(self):
         assert normalize_amount("  100.50  ") == "100.50"  # With spaces
         assert normalize_amount("-0") == "0.00"
         assert normalize_amount("00100.50") == "100.50"  # Leading zeros
+        assert normalize_amount("-0.00") == "0.00"
+        assert normalize_amount("-00.50") == "-0.50"
+        assert normalize_amount("١٠.٥٠") == "10.50"  # Non-ASCII digits go through Decimal
+
+    def test_precision_limit(self):
+        # Acceptance doesn't depend on how an amount is written
+        assert normalize_amount("9" * 26 + ".99") == "9" * 26 + ".99"
+        assert normalize_amount("1234567890123456789012345678.90") is None
+        assert normalize_amount("1234567890123456789012345678.9") is None
+        assert normalize_amount("1234567890123456789012345678") is None
 
 
 class TestAccountValidation:
@@ -119,6 +155,8 @@ class TestAccountValidation:
         assert validate_account("") is None
         assert validate_account(None) is None
         assert validate_account("ABC") is None  # All letters
+        assert validate_account("\u0661\u0662\u0663") is None  # Non-ASCII digits
+        assert validate_account(["123"]) is None
     
     def test_edge_cases(self):
         assert validate_account("  123  ") == "123"  # With spaces
@@ -147,6 +185,7 @@ class TestDescriptionCleaning:
         result = clean_description(long_text)
         assert len(result) == 255
         assert result == "A" * 255
+        assert clean_description("  Opening balance  ", 7) == "Opening"  # Custom limit
     
     def test_edge_cases(self):
         assert clean_description(123) == "123"  # Non-string input
@@ -164,7 +203,12 @@ class TestETLPipeline:
         
         conn = sqlite3.connect(path)
         cursor = conn.cursor()
-        
+
+        # Throwaway file, so skip fsyncs and build it in one transaction
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        cursor.execute("BEGIN")
+
         # Create table
         cursor.execute('''
             CREATE TABLE journal_entries (
@@ -205,36 +249,76 @@ class TestETLPipeline:
         # Cleanup
         if os.path.exists(path):
             os.unlink(path)
+
+    @pytest.fixture
+    def make_db(self, tmp_path):
+        """Return a function building a journal database from (Date, Account, Amount, Description) rows"""
+        def make(rows):
+            path = tmp_path / "journal_entries.db"
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE journal_entries (Date, Account, Amount, Description)")
+            conn.executemany("INSERT INTO journal_entries VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
+            conn.close()
+            return str(path)
+        return make
     
     def test_pipeline_extraction(self, temp_db):
         """Test data extraction from database"""
         pipeline = ETLPipeline(temp_db, "dummy.xml")
-        data = pipeline.extract()
+        data = list(pipeline.extract())
         
-        assert len(data) == 8
-        assert data[0]['Date'] == "2024-01-01"
-        assert data[0]['Account'] == "101"
+        assert len(data) == 6  # Two rows with invalid accounts filtered in SQL
+        assert pipeline.skipped_records == 2
+        assert data[0][0] == "2024-01-01"  # Date
+        assert data[0][1] == "101"  # Account
     
     def test_pipeline_transformation(self, temp_db):
         """Test data transformation"""
         pipeline = ETLPipeline(temp_db, "dummy.xml")
         raw_data = pipeline.extract()
-        transformed = pipeline.transform(raw_data)
+        transformed = list(pipeline.transform(raw_data))
         
         assert len(transformed) == 4  # Only 4 valid records
         assert pipeline.total_records == 8
         assert pipeline.valid_records == 4
         assert pipeline.skipped_records == 4
         
-        # Check first transformed record
-        assert transformed[0]['Date'] == "2024-01-01"
-        assert transformed[0]['Account'] == "101"
-        assert transformed[0]['Amount'] == "100.00"
-        assert transformed[0]['Description'] == "Opening balance"
+        # Check first transformed record (Date, Account, Amount, Description)
+        assert transformed[0] == ("2024-01-01", "101", "100.00", "Opening balance")
         
         # Check record with transformations
-        assert transformed[2]['Date'] == "2023-12-31"  # US format converted
-        assert transformed[2]['Amount'] == "-25.50"  # European comma converted
+        assert transformed[2][0] == "2023-12-31"  # US format converted
+        assert transformed[2][2] == "-25.50"  # European comma converted
+    
+    def test_parallel_transformation(self, temp_db, monkeypatch):
+        """Test worker processes produce the same records, in order"""
+        monkeypatch.setattr(pipeline_module, "MIN_PARALLEL_ROWS", 1)
+        serial = ETLPipeline(temp_db, "dummy.xml")
+        expected = list(serial.transform(serial.extract()))
+
+        config = ETLConfig.default()
+        config.processing.workers = 2
+        config.processing.batch_size = 3
+        parallel = ETLPipeline(temp_db, "dummy.xml", config=config)
+        transformed = list(parallel.transform(parallel.extract()))
+
+        assert transformed == expected
+        assert parallel.valid_records == 4
+        assert parallel.skipped_records == 4
+
+    def test_small_input_skips_worker_pool(self, temp_db, monkeypatch):
+        """Test inputs below MIN_PARALLEL_ROWS are normalized in-process"""
+        def fail(*args):
+            raise AssertionError("worker pool started for a small input")
+        monkeypatch.setattr(pipeline_module, "_normalize_parallel", fail)
+
+        config = ETLConfig.default()
+        config.processing.workers = 2
+        pipeline = ETLPipeline(temp_db, "dummy.xml", config=config)
+        transformed = list(pipeline.transform(pipeline.extract()))
+
+        assert len(transformed) == 4
     
     def test_pipeline_xml_generation(self, temp_db, temp_output):
         """Test XML generation"""
@@ -244,24 +328,46 @@ class TestETLPipeline:
         # Check file exists
         assert os.path.exists(temp_output)
         
-        # Parse and validate XML structure
-        tree = etree.parse(temp_output)
-        root = tree.getroot()
-        
-        assert root.tag == "Journal"
-        entries = root.findall("Entry")
-        assert len(entries) == 4
+        # Stream the XML back, keeping only the fields of the first and
+        # last entries rather than the whole tree
+        root = None
+        count = 0
+        first_entry = last_entry = None
+        for event, element in etree.iterparse(temp_output, events=('start', 'end')):
+            if root is None:
+                root = element
+            elif event == 'end' and element.tag == "Entry" and element.getparent() is root:
+                last_entry = {child.tag: child.text for child in element}
+                if first_entry is None:
+                    first_entry = last_entry
+                count += 1
+                element.clear()
+
+        assert root is not None and root.tag == "Journal"
+        assert count == 4
         
         # Check first entry
-        first_entry = entries[0]
-        assert first_entry.find("Date").text == "2024-01-01"
-        assert first_entry.find("Account").text == "101"
-        assert first_entry.find("Amount").text == "100.00"
-        assert first_entry.find("Description").text == "Opening balance"
+        assert first_entry["Date"] == "2024-01-01"
+        assert first_entry["Account"] == "101"
+        assert first_entry["Amount"] == "100.00"
+        assert first_entry["Description"] == "Opening balance"
         
         # Check entry with empty description
-        last_entry = entries[3]
-        assert last_entry.find("Description") is None  # Should not be present
+        assert "Description" not in last_entry  # Should not be present
+
+    def test_description_escaping(self, temp_output):
+        """Test special characters in descriptions survive a round trip"""
+        description = 'R&D <expenses> "Q1"\r\nß €'
+        pipeline = ETLPipeline("dummy.db", temp_output)
+        pipeline.load([("2024-01-01", "101", "1.00", description)])
+
+        tree = etree.parse(temp_output)
+        assert tree.findtext("Entry/Description") == description
+
+        # A failure part-way through leaves the previous output untouched
+        with pytest.raises(ValueError):
+            pipeline.load([("2024-01-01", "102", "2.00", "ok"), ("2024-01-01", "101", "1.00", "Bell\x07")])
+        assert etree.parse(temp_output).findtext("Entry/Description") == description
     
     def test_empty_database(self):
         """Test handling of empty database"""
@@ -292,11 +398,43 @@ class TestETLPipeline:
         tree = etree.parse(output_path)
         root = tree.getroot()
         assert len(root.findall("Entry")) == 0
+        assert Path(output_path).read_bytes().endswith(b"\n<Journal/>\n")  # As lxml writes it
         
         # Cleanup
         os.unlink(db_path)
         os.unlink(output_path)
     
+    def test_extract_account_filter_matches_validator(self, make_db):
+        """Test SQL account pre-filter agrees with validate_account"""
+        accounts = [
+            "\u00a0123\t", " 123456789012 ", "12", "1234567890123",
+            "12A", "1 23", 456, None, "\u3000" + "9" * 12,
+        ]
+        db_path = make_db([("2024-01-01", account, "1", "") for account in accounts])
+
+        pipeline = ETLPipeline(db_path, "dummy.xml")
+        extracted = [row[1] for row in pipeline.extract()]
+
+        assert extracted == [account for account in accounts if validate_account(account)]
+        assert pipeline.skipped_records == len(accounts) - len(extracted)
+
+    def test_extract_filter_keeps_valid_dates_and_amounts(self, make_db):
+        """Test SQL date/amount pre-filter never drops a record transform accepts"""
+        rows = [
+            ("2024-01-01", "1e3"), (" 1/5/2024 ", " 1,5 "), ("31-12-2023", "١٠"),
+            ("20240101", "100"), (20240101, "100"), ("2024-01-01", 100), ("2024-01-01", None),
+            (None, "100"), ("invalid-date", "100"), ("2024-01-01", "invalid"),
+        ]
+        db_path = make_db([(date, "101", amount, "") for date, amount in rows])
+
+        pipeline = ETLPipeline(db_path, "dummy.xml")
+        transformed = list(pipeline.transform(pipeline.extract()))
+
+        expected = [(normalize_date(d), normalize_amount(a)) for d, a in rows
+                    if normalize_date(d) and normalize_amount(a)]
+        assert [(record[0], record[2]) for record in transformed] == expected
+        assert pipeline.skipped_records == len(rows) - len(expected)
+
     def test_database_error(self):
         """Test handling of database errors"""
         pipeline = ETLPipeline("non_existent.db", "dummy.xml")
@@ -306,13 +444,8 @@ class TestETLPipeline:
     
     def test_schema_validation(self, temp_db, temp_output):
         """Test XML schema validation"""
-        # Get schema path relative to test file location
-        test_dir = Path(__file__).parent
-        project_root = test_dir.parent
-        schema_path = str(project_root / "sources" / "schema.xsd")
-        
-        if Path(schema_path).exists():
-            pipeline = ETLPipeline(temp_db, temp_output, schema_path)
+        if _SCHEMA_EXISTS:
+            pipeline = ETLPipeline(temp_db, temp_output, str(_SCHEMA_PATH))
             pipeline.run()
             
             # Verify schema reference in XML
@@ -322,6 +455,62 @@ class TestETLPipeline:
             ns = "{http://www.w3.org/2001/XMLSchema-instance}"
             assert root.get(f"{ns}noNamespaceSchemaLocation") == "schema.xsd"
 
+    def test_invalid_output_keeps_previous_file(self, make_db, temp_output):
+        """Test output failing schema validation raises and doesn't replace the old file"""
+        db_path = make_db([("2024-01-01", "101", "1", "A" * 300)])
+
+        schema_path = str(_SCHEMA_PATH)
+        config = ETLConfig.default()
+        config.processing.max_description_length = 300  # Beyond the schema's limit
+        pipeline = ETLPipeline(db_path, temp_output, schema_path, config)
+        Path(temp_output).write_text("previous output")
+
+        with pytest.raises(etree.DocumentInvalid):
+            pipeline.run()
+        assert Path(temp_output).read_text() == "previous output"
+        assert not list(Path(temp_output).parent.glob(".journal-*.xml.tmp"))
+
+    @pytest.mark.parametrize("batch_size", [0, -1])
+    def test_invalid_batch_size(self, temp_db, temp_output, batch_size):
+        """Test a non-positive batch size is rejected before any work is done"""
+        config = ETLConfig.default()
+        config.processing.batch_size = batch_size
+        with pytest.raises(ValueError, match="batch_size"):
+            ETLPipeline(temp_db, temp_output, config=config)
+
+    def test_output_file_mode(self, make_db, tmp_path):
+        """Test the output gets the umask default mode, or keeps the replaced file's mode"""
+        db_path = make_db([("2024-01-01", "101", "1", "Test")])
+        new_output = tmp_path / "new.xml"
+        ETLPipeline(db_path, str(new_output)).run()
+        umask = os.umask(0)
+        os.umask(umask)
+        assert stat.S_IMODE(new_output.stat().st_mode) == 0o666 & ~umask
+
+        existing_output = tmp_path / "existing.xml"
+        existing_output.write_text("previous output")
+        existing_output.chmod(0o640)
+        link = tmp_path / "link.xml"
+        link.symlink_to(existing_output)
+        ETLPipeline(db_path, str(link)).run()
+        assert link.is_symlink()
+        assert stat.S_IMODE(existing_output.stat().st_mode) == 0o640
+        assert existing_output.read_text().startswith("<?xml")
+
+
+class TestConfig:
+    """Test cases for configuration loading"""
+
+    def test_cached_config_reloaded_on_change(self, tmp_path):
+        config_path = tmp_path / "config.json"
+        config_path.write_text('{"processing": {"batch_size": 10}}')
+
+        first = ETLConfig.load_from_file(str(config_path))
+        first.processing.batch_size = 99  # Must not leak into the cache
+        assert ETLConfig.load_from_file(str(config_path)).processing.batch_size == 10
+
+        config_path.write_text('{"processing": {"batch_size": 2000}}')
+        assert ETLConfig.load_from_file(str(config_path)).processing.batch_size == 2000
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file